@@ -17,7 +17,6 @@ from .. import constants
 from .alias import Alias
 from .tablebackendtype import TableBackendType
 
-
 _config_upgrade_order: List[
     Tuple[str, Callable[["SqlTermConfig", str], "SqlTermConfig"]]
 ]
@@ -90,13 +89,18 @@ class SqlTermConfig:
             os.makedirs(dir_path)
 
     @staticmethod
-    def _ensure_file(file_path: str) -> None:
+    def _ensure_file(file_path: str) -> "SqlTermConfig | None":
         # first, ensure the directory exists
         SqlTermConfig._ensure_directory(os.path.dirname(file_path))
 
-        # then, create the file if needed
+        # then, create the file if needed. hand the config that was written back to
+        # the caller so that it doesn't have to read it back from disk
         if not os.path.isfile(file_path):
-            SqlTermConfig.make_default().to_file(file_path)
+            default_config: SqlTermConfig = SqlTermConfig.make_default()
+            default_config.to_file(file_path)
+            return default_config
+
+        return None
 
     @classmethod
     def from_dict(
@@ -137,8 +141,10 @@ class SqlTermConfig:
                 layout of a SqlTermConfig instance
         """
 
-        # check if the config file exists and create it if not
-        SqlTermConfig._ensure_file(path)
+        # check if the config file exists and create it if not. if we just wrote
+        # the default config, return it rather than parsing it back in
+        if (default_config := SqlTermConfig._ensure_file(path)) is not None:
+            return default_config
 
         # pylint: disable=broad-exception-caught
         try:
@@ -26,6 +26,7 @@ APPLICATION_NAME: str = __name__[: __name__.index(".")]
 APPLICATION_VERSION: str = __version__
 
 COMMAND_SUGGESTION_MAX_DISTANCE: int = 5
+COMPLETION_RANKING_DISTANCE_PADDING: int = 8
 
 CONFIG_VERSION: str = "0.1"
 
@@ -33,6 +34,7 @@ PREFIX_SHELL_COMMAND: str = "!"
 PREFIX_SQLTERM_COMMAND: str = "%"
 
 PROGRESS_CHARACTERS: List[str] = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+PROGRESS_INTERVAL_SECONDS: float = 0.1
 
 SHELL_DEFAULT: str
 try:
@@ -41,6 +43,9 @@ except shellingham.ShellDetectionFailure:
     SHELL_DEFAULT = _get_fallback_shell()
 
 SPACES_IN_TAB: int = 4
+SPACES_IN_TAB_TEXT: str = " " * SPACES_IN_TAB
+
+TERMINAL_SIZE_CACHE_SECONDS: float = 0.25
 
 TREE_VIEW_COLLAPSED_CHAR: str = "▷"
 TREE_VIEW_EXPANDED_CHAR: str = "▽"
@@ -5,8 +5,11 @@ Contains the definition of the DefaultCompleter class, a context-insensitive com
 that is the default used by sqlterm when no other more specific option is available
 """
 
+from bisect import bisect_left, bisect_right
+import functools
+import itertools
 import re
-from typing import Dict, List, Set
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
 
 from Levenshtein import distance
 from prompt_toolkit.contrib.completers.system import SystemCompleter
@@ -37,6 +40,145 @@ _sql_object_type_short_names: Dict[SqlObjectType, str] = {
     SqlObjectType.VIEW: "view",
 }
 
+# display metas for every object type, falling back to the type name for any type
+# without a short name so that no conditional lookup is needed per object
+_sql_object_type_display_metas: Dict[SqlObjectType, str] = {
+    object_type: _sql_object_type_short_names.get(object_type, object_type.name)
+    for object_type in SqlObjectType
+}
+
+# object types that are only completed inline with their parent and are therefore
+# left out of the completion index
+_sql_object_types_not_indexed: FrozenSet[SqlObjectType] = frozenset(
+    (
+        SqlObjectType.COLUMN,
+        SqlObjectType.INDEX,
+        SqlObjectType.PARAMETER,
+    )
+)
+
+_partial_shell_split_pattern: re.Pattern = re.compile(r'"([^"]*)"|"(.*)|(\S+)')
+
+# prefix index of all ansi sql keywords and functions as (key, text, meta) entries.
+# the entries are sorted by their upper-case key so that every entry sharing a prefix
+# is contiguous and can be found with a binary search instead of a scan of every entry
+_ansi_sql_completions: List[Tuple[str, str, str]] = sorted(
+    [(keyword.upper(), keyword, "keyword") for keyword in constants.ANSI_SQL_KEYWORDS]
+    + [
+        (function.upper(), function, "function")
+        for function in constants.ANSI_SQL_FUNCTIONS
+    ]
+)
+_ansi_sql_completion_keys: List[str] = [key for key, _, __ in _ansi_sql_completions]
+
+
+def _get_prefix_matches(
+    sorted_keys: List[str], entries: List[Tuple[str, str, str]], prefix: str
+) -> Iterator[Tuple[str, str, str]]:
+    index: int = bisect_left(sorted_keys, prefix)
+    while index < len(sorted_keys) and sorted_keys[index].startswith(prefix):
+        yield entries[index]
+        index += 1
+
+
+# NOTE: completions are never modified once they've been returned so the same instance
+# is reused whenever a name is matched again at the same start position. constructing
+# a Completion is expensive relative to the lookup. the cache is bounded so that a long
+# session against a large schema doesn't accumulate a completion for every match
+@functools.lru_cache(maxsize=4096)
+def _get_inspector_completion(
+    name: str, display_meta: str, start_position: int
+) -> Completion:
+    return Completion(name, start_position=start_position, display_meta=display_meta)
+
+
+class _InspectorIndex:
+    """
+    class _InspectorIndex
+
+    Index of the names of all completable objects in an inspected database structure.
+    The upper-case names are joined into a single string (separated by a character
+    that can't be typed) so that a substring search over all of them runs as one
+    str.find() call. The names, their display metas and their offsets in the joined
+    string are kept in parallel lists
+    """
+
+    display_metas: List[str]
+    name_index: str
+    name_offsets: List[int]
+    names: List[str]
+
+    def __init__(
+        self: "_InspectorIndex",
+        names: List[str],
+        display_metas: List[str],
+        name_index: str,
+        name_offsets: List[int],
+    ) -> None:
+        self.display_metas = display_metas
+        self.name_index = name_index
+        self.name_offsets = name_offsets
+        self.names = names
+
+    def find_matches(self: "_InspectorIndex", word_before_cursor: str) -> Iterator[int]:
+        """
+        Finds all of the indexed names that contain the provided word.
+
+        Args:
+            word_before_cursor (str): The upper-case word to search for
+
+        Yields:
+            int: The index of each name that contains the word
+
+        Raises:
+            Nothing
+        """
+
+        if len(word_before_cursor) == 0:
+            yield from range(len(self.names))
+            return
+
+        # search the joined name index for the word and map each hit back to the
+        # name it occurred in. after a hit, resume the search at the start of the
+        # following name so that each name is only matched once
+        offsets: List[int] = self.name_offsets
+        position: int = self.name_index.find(word_before_cursor)
+        while position != -1:
+            match_index: int = bisect_right(offsets, position) - 1
+            yield match_index
+
+            if match_index + 1 == len(offsets):
+                return
+
+            position = self.name_index.find(
+                word_before_cursor, offsets[match_index + 1]
+            )
+
+    def get_completion(
+        self: "_InspectorIndex", match_index: int, start_position: int
+    ) -> Completion:
+        """
+        Gets the completion for the indexed name at the provided index.
+
+        Args:
+            match_index (int): The index of the name to get a completion for
+            start_position (int): The start position of the completion relative to
+                the cursor
+
+        Returns:
+            Completion: The completion for the name
+
+        Raises:
+            Nothing
+        """
+
+        return _get_inspector_completion(
+            self.names[match_index], self.display_metas[match_index], start_position
+        )
+
+
+_empty_inspector_index: _InspectorIndex = _InspectorIndex([], [], "", [])
+
 
 class DefaultCompleter(Completer):
     """
@@ -47,18 +189,22 @@ class DefaultCompleter(Completer):
     """
 
     inspector_structure: SqlStructure | None
-    inspector_structure_flattened: Set[SqlObject] | None
 
+    _command_completion_keys: List[str]
+    _command_completions: List[Tuple[str, str, str]]
+    _inspector_index: _InspectorIndex
     _parent: "PromptToolkitBackend"
-    _system_completer: SystemCompleter
+    _system_completer: SystemCompleter | None
 
     def __init__(self: "DefaultCompleter", parent: "PromptToolkitBackend") -> None:
         super().__init__()
 
         self.inspector_structure = None
-        self.inspector_structure_flattened = None
+        self._inspector_index = _empty_inspector_index
+        self._command_completion_keys = []
+        self._command_completions = []
         self._parent = parent
-        self._system_completer = SystemCompleter()
+        self._system_completer = None
 
     def clear_completions(self: "DefaultCompleter") -> None:
         """
@@ -75,7 +221,30 @@ class DefaultCompleter(Completer):
         """
 
         self.inspector_structure = None
-        self.inspector_structure_flattened = None
+        self._inspector_index = _empty_inspector_index
+
+    def _get_command_prefix_index(
+        self: "DefaultCompleter",
+    ) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+        # plugins can register additional commands after this completer is constructed
+        # so the index is built on first use and rebuilt if the set of commands grows
+        if len(self._command_completions) != len(available_commands):
+            self._command_completions = sorted(
+                (command.upper(), command, "command") for command in available_commands
+            )
+            self._command_completion_keys = [
+                key for key, _, __ in self._command_completions
+            ]
+
+        return self._command_completion_keys, self._command_completions
+
+    def _get_system_completer(self: "DefaultCompleter") -> SystemCompleter:
+        # the system completer is only needed once the user starts typing a shell
+        # command so don't construct it until then
+        if self._system_completer is None:
+            self._system_completer = SystemCompleter()
+
+        return self._system_completer
 
     def get_completions(
         self: "DefaultCompleter", document: Document, complete_event: CompleteEvent
@@ -84,92 +253,95 @@ class DefaultCompleter(Completer):
         if len(word_before_cursor) == 0 and not complete_event.completion_requested:
             return []
 
-        completions: List[Completion] = self._get_completions_unsorted(
+        completions: Iterable[Completion] = self._get_completions_unsorted(
             document, word_before_cursor, complete_event
         )
-        completions.sort(
-            key=lambda completion: distance(completion.text, word_before_cursor)
+
+        # completions that start with the word before the cursor are the most likely
+        # candidates. rank those first by length so that edit distances only need to
+        # be computed for the remaining completions
+        prefix_completions: List[Completion] = []
+        other_completions: List[Completion] = []
+        for completion in completions:
+            if completion.text.upper().startswith(word_before_cursor):
+                prefix_completions.append(completion)
+            else:
+                other_completions.append(completion)
+
+        prefix_completions.sort(key=lambda completion: len(completion.text))
+
+        # rank the rest by their case-insensitive edit distance from the word before
+        # the cursor. the distance is bounded so that scoring can stop early for
+        # completions that are a poor match; all of those are ranked equally
+        score_cutoff: int = (
+            len(word_before_cursor) + constants.COMPLETION_RANKING_DISTANCE_PADDING
+        )
+        other_completions.sort(
+            key=lambda completion: distance(
+                completion.text,
+                word_before_cursor,
+                processor=str.upper,
+                score_cutoff=score_cutoff,
+            )
         )
 
-        return completions
+        return prefix_completions + other_completions
 
     def _get_completions_unsorted(
         self, document: Document, word_before_cursor: str, complete_event: CompleteEvent
-    ) -> List[Completion]:
+    ) -> Iterable[Completion]:
         match document.current_line[:1]:
             case constants.PREFIX_SHELL_COMMAND:
-                return list(
-                    self._system_completer.get_completions(
-                        Document(
-                            text=document.text[1:],
-                            cursor_position=document.cursor_position - 1,
-                        ),
-                        complete_event,
-                    )
+                return self._get_system_completer().get_completions(
+                    Document(
+                        text=document.text[1:],
+                        cursor_position=document.cursor_position - 1,
+                    ),
+                    complete_event,
                 )
             case constants.PREFIX_SQLTERM_COMMAND:
                 return self._get_completions_sqlterm_command(
                     word_before_cursor, document, complete_event
                 )
             case _:
-                return self._get_completions_ansi_sql(
-                    word_before_cursor
-                ) + self._get_completions_inspector(word_before_cursor)
+                return itertools.chain(
+                    self._get_completions_ansi_sql(word_before_cursor),
+                    self._get_completions_inspector(word_before_cursor),
+                )
 
     def _get_completions_inspector(
         self: "DefaultCompleter", word_before_cursor: str
     ) -> List[Completion]:
-        if self.inspector_structure_flattened is None:
+        if self.inspector_structure is None:
             return []
 
-        # NOTE: we should eventually perform contextual completions here
+        # NOTE: we should eventually perform contextual completions here. the word
+        # before the cursor was already upper-cased by get_completions() and the names
+        # in the index were upper-cased when it was built
+        inspector_index: _InspectorIndex = self._inspector_index
+        start_position: int = -len(word_before_cursor)
         return [
-            Completion(
-                sql_object.name,
-                start_position=-len(word_before_cursor),
-                display_meta=(
-                    _sql_object_type_short_names[sql_object.type]
-                    if sql_object.type in _sql_object_type_short_names
-                    else sql_object.type.name
-                ),
-            )
-            for sql_object in self.inspector_structure_flattened
-            if word_before_cursor.upper() in sql_object.name.upper()
-            and (
-                sql_object.type
-                not in {
-                    SqlObjectType.COLUMN,
-                    SqlObjectType.INDEX,
-                    SqlObjectType.PARAMETER,
-                }
-            )
+            inspector_index.get_completion(match_index, start_position)
+            for match_index in inspector_index.find_matches(word_before_cursor)
         ]
 
     def _get_completions_ansi_sql(
         self: "DefaultCompleter", word_before_cursor: str
     ) -> List[Completion]:
-        return (
-            [
-                Completion(
-                    keyword,
-                    start_position=-len(word_before_cursor),
-                    display_meta="keyword",
-                )
-                for keyword in constants.ANSI_SQL_KEYWORDS
-                if keyword.upper().startswith(word_before_cursor)
-            ]
-            + [
-                Completion(
-                    keyword,
-                    start_position=-len(word_before_cursor),
-                    display_meta="function",
-                )
-                for keyword in constants.ANSI_SQL_FUNCTIONS
-                if keyword.upper().startswith(word_before_cursor)
-            ]
-            if self.inspector_structure_flattened is None
-            else []
-        )
+        if self.inspector_structure is not None:
+            return []
+
+        start_position: int = -len(word_before_cursor)
+        return [
+            Completion(
+                text,
+                start_position=start_position,
+                display_meta=display_meta,
+            )
+            for _, text, display_meta in _get_prefix_matches(
+                _ansi_sql_completion_keys, _ansi_sql_completions, word_before_cursor
+            )
+        ]
 
     def _get_completions_sqlterm_command(
         self: "DefaultCompleter",
@@ -177,12 +349,10 @@ class DefaultCompleter(Completer):
         document: Document,
         complete_event: CompleteEvent,
     ) -> List[Completion]:
-        partial_shell_split_pattern: str = r'"([^"]*)"|"(.*)|(\S+)'
-
         command_tokens: List[str] = [
             quote1 if quote1 else (quote2 if quote2 else word)
-            for quote1, quote2, word in re.findall(
-                partial_shell_split_pattern, document.text
+            for quote1, quote2, word in _partial_shell_split_pattern.findall(
+                document.text
             )
         ]
         if len(command_tokens) > 0:
@@ -194,15 +364,21 @@ class DefaultCompleter(Completer):
                 word_before_cursor = command_tokens[-1]
 
         if len(command_tokens) < 2 and not complete_event.completion_requested:
+            start_position: int = -len(word_before_cursor)
             return [
                 Completion(
                     command,
-                    start_position=-len(word_before_cursor),
-                    display_meta="command",
+                    start_position=start_position,
+                    display_meta=display_meta,
+                )
+                for _, command, display_meta in _get_prefix_matches(
+                    *self._get_command_prefix_index(),
+                    (
+                        ""
+                        if word_before_cursor == constants.PREFIX_SQLTERM_COMMAND
+                        else word_before_cursor.upper()
+                    ),
                 )
-                for command in available_commands
-                if word_before_cursor == constants.PREFIX_SQLTERM_COMMAND
-                or command.upper().startswith(word_before_cursor.upper())
             ]
 
         if command_tokens[0].lower() in available_commands:
@@ -236,5 +412,43 @@ class DefaultCompleter(Completer):
             Nothing
         """
 
+        # index the names of all completable objects once here rather than scanning
+        # every object on each keystroke
+        names: List[str] = []
+        display_metas: List[str] = []
+        names_upper: List[str] = []
+        name_offsets: List[int] = []
+        name_offset: int = 0
+
+        # NOTE: the structure is walked directly instead of being flattened into a set
+        # first. flattening hashes every object's entire subtree at each level of the
+        # hierarchy whereas here each object is only visited once. duplicates are
+        # dropped by the completion they would produce instead
+        indexed_completions: Set[Tuple[str, str]] = set()
+        pending_objects: List[SqlObject] = [
+            *structure.objects,
+            *structure.keywords,
+            *structure.builtin_types,
+        ]
+        while len(pending_objects) > 0:
+            sql_object: SqlObject = pending_objects.pop()
+            pending_objects.extend(sql_object.children)
+
+            if sql_object.type in _sql_object_types_not_indexed:
+                continue
+
+            display_meta: str = _sql_object_type_display_metas[sql_object.type]
+            if (sql_object.name, display_meta) in indexed_completions:
+                continue
+
+            indexed_completions.add((sql_object.name, display_meta))
+            names.append(sql_object.name)
+            display_metas.append(display_meta)
+            names_upper.append(name_upper := sql_object.name.upper())
+            name_offsets.append(name_offset)
+            name_offset += len(name_upper) + 1
+
+        self._inspector_index = _InspectorIndex(
+            names, display_metas, "\0".join(names_upper), name_offsets
+        )
         self.inspector_structure = structure
-        self.inspector_structure_flattened = self.inspector_structure.flatten()
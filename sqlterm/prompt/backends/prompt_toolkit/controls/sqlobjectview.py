@@ -1,3 +1,4 @@
+import functools
 from typing import Dict, List, Tuple
 
 from prompt_toolkit.formatted_text import FormattedText
@@ -44,12 +45,69 @@ _sql_object_type_format_classes: Dict[SqlObjectType, str] = {
 }
 
 
+@functools.lru_cache(maxsize=4096)
+def _get_sql_object_label(
+    object_type: SqlObjectType, object_name: str
+) -> Tuple[Tuple[str, str], ...]:
+    if object_type in _sql_object_type_characters:
+        return (
+            (
+                (
+                    _sql_object_type_format_classes[object_type]
+                    if object_type in _sql_object_type_format_classes
+                    else ""
+                ),
+                f"{_sql_object_type_characters[object_type]} ",
+            ),
+            ("class:object-browser.object-name", f"{object_name}"),
+        )
+
+    return (("", "   "), ("class:object-browser.object-name", f"{object_name}"))
+
+
+# NOTE: the fragments for an object only depend on the arguments below so they're
+# cached and shared between object views. re-expanding or collapsing an object that
+# was already displayed then doesn't have to rebuild them
+@functools.lru_cache(maxsize=4096)
+def _get_text_fragments(
+    object_type: SqlObjectType,
+    object_name: str,
+    indent_width: int,
+    has_children: bool,
+    collapsed: bool,
+) -> FormattedText:
+    prefix: Tuple[Tuple[str, str], ...]
+    if not has_children:
+        prefix = (
+            (
+                "",
+                " " * (indent_width + len(constants.TREE_VIEW_EXPANDED_CHAR) + 1),
+            ),
+        )
+    elif not collapsed:
+        prefix = (
+            ("", " " * indent_width),
+            ("class:object-browser.icon-expand", constants.TREE_VIEW_EXPANDED_CHAR),
+            ("", " "),
+        )
+    else:
+        prefix = (
+            ("", " " * indent_width),
+            (
+                "class:object-browser.icon-collapse",
+                constants.TREE_VIEW_COLLAPSED_CHAR,
+            ),
+            ("", " "),
+        )
+
+    return FormattedText(prefix + _get_sql_object_label(object_type, object_name))
+
+
 class SqlObjectView(Window):
-    __children: List["SqlObjectView"]
     __expanded: bool
-    index: int
     indent_level: int
     parent: HSplit = None  # type: ignore
+    parent_view: "SqlObjectView | None"
     sql_object: SqlObject
 
     indent_length: int = 2
@@ -57,16 +115,15 @@ class SqlObjectView(Window):
     def __init__(
         self: "SqlObjectView",
         sql_object: SqlObject,
-        index: int,
         parent: HSplit = None,
         indent_level: int = 0,
+        parent_view: "SqlObjectView | None" = None,
     ) -> None:
         self.__expanded = False
         self.sql_object = sql_object
         self.indent_level = indent_level
-        self.__children = []
-        self.index = index
         self.parent = parent
+        self.parent_view = parent_view
 
         super().__init__(
             content=self._get_text_content(collapsed=not self.__expanded),
@@ -77,31 +134,29 @@ class SqlObjectView(Window):
         if not self.__expanded:
             return
 
-        # collapse all children of this object
-        self.__children.reverse()
-        for child in self.__children:
-            # pylint: disable=protected-access
-            child._collapse()
-
-        # remove the children from the parent HSplit
-        for index in range(self.index + len(self.sql_object.children), self.index, -1):
-            del self.parent.children[index]
+        # all visible descendants of this object directly follow it in the parent
+        # HSplit and are indented further than it is. remove all of them at once
+        start_index: int = self.index + 1
+        end_index: int = start_index
+        while (
+            end_index < len(self.parent.children)
+            and self.parent.children[end_index].indent_level > self.indent_level
+        ):
+            end_index += 1
 
-        self.__children = []
+        del self.parent.children[start_index:end_index]
 
         # update the content of this object view to show it as collapsed
         self.content = self._get_text_content(collapsed=True)
 
-        # propagate the new indices to all controls below this one
-        for update_index in range(self.index + 1, len(self.parent.children)):
-            self.parent.children[update_index].index = update_index
-
     def collapse_or_find_parent(self: "SqlObjectView", layout: Layout) -> int:
+        own_index: int = self.index
+
         if self.__expanded:
             self._collapse()
             self.__expanded = False
         else:
-            parent_index: int = self.index
+            parent_index: int = own_index
             while parent_index > 0 and (
                 self.parent.get_children()[parent_index].indent_level
                 == self.indent_level
@@ -112,34 +167,22 @@ class SqlObjectView(Window):
                 layout.focus(self.parent.get_children()[parent_index])
                 return parent_index
 
-        return self.index
+        return own_index
 
     def _expand(self: "SqlObjectView") -> None:
         self.content = self._get_text_content(collapsed=False)
 
-        for offset, child_object in enumerate(
-            sorted(
-                self.sql_object.children,
-                key=lambda sql_object: (sql_object.type, sql_object.name.lower()),
-            ),
-            start=1,
-        ):
-            self.parent.children.insert(
-                self.index + offset,
-                new_child := SqlObjectView(
-                    child_object,
-                    index=self.index + offset,
-                    parent=self.parent,
-                    indent_level=self.indent_level + 1,
-                ),
+        # insert views for all of the children directly below this one
+        insert_index: int = self.index + 1
+        self.parent.children[insert_index:insert_index] = [
+            SqlObjectView(
+                child_object,
+                parent=self.parent,
+                indent_level=self.indent_level + 1,
+                parent_view=self,
             )
-
-            self.__children.append(new_child)
-
-        for update_index in range(
-            self.index + len(self.sql_object.children), len(self.parent.children)
-        ):
-            self.parent.children[update_index].index = update_index
+            for child_object in self.sql_object.sorted_children
+        ]
 
     def expand_if_collapsed(self: "SqlObjectView") -> None:
         if self.__expanded:
@@ -148,74 +191,38 @@ class SqlObjectView(Window):
         self._expand()
         self.__expanded = True
 
-    def _get_sql_object_label(
-        self: "SqlObjectView", sql_object: SqlObject
-    ) -> List[Tuple[str, str]]:
-        if sql_object.type in _sql_object_type_characters:
-            return [
-                (
-                    (
-                        _sql_object_type_format_classes[sql_object.type]
-                        if sql_object.type in _sql_object_type_format_classes
-                        else ""
-                    ),
-                    f"{_sql_object_type_characters[sql_object.type]} ",
-                ),
-                ("class:object-browser.object-name", f"{sql_object.name}"),
-            ]
-
-        return [("", "   "), ("class:object-browser.object-name", f"{sql_object.name}")]
-
     def _get_text_content(
         self: "SqlObjectView", collapsed: bool
     ) -> FormattedTextControl:
-        if len(self.sql_object.children) == 0:
-            return FormattedTextControl(
-                FormattedText(
-                    [
-                        (
-                            "",
-                            " "
-                            * (
-                                self.indent_level * self.indent_length
-                                + len(constants.TREE_VIEW_EXPANDED_CHAR)
-                                + 1
-                            ),
-                        ),
-                        *self._get_sql_object_label(self.sql_object),
-                    ]
-                )
-            )
-
-        if not collapsed:
-            return FormattedTextControl(
-                FormattedText(
-                    [
-                        ("", " " * self.indent_level * self.indent_length),
-                        (
-                            "class:object-browser.icon-expand",
-                            constants.TREE_VIEW_EXPANDED_CHAR,
-                        ),
-                        ("", " "),
-                        *self._get_sql_object_label(self.sql_object),
-                    ]
-                )
-            )
-
         return FormattedTextControl(
-            FormattedText(
-                [
-                    ("", " " * self.indent_level * self.indent_length),
-                    (
-                        "class:object-browser.icon-collapse",
-                        constants.TREE_VIEW_COLLAPSED_CHAR,
-                    ),
-                    ("", " "),
-                    *self._get_sql_object_label(self.sql_object),
-                ]
+            _get_text_fragments(
+                self.sql_object.type,
+                self.sql_object.name,
+                self.indent_level * self.indent_length,
+                len(self.sql_object.children) > 0,
+                collapsed,
             )
         )
 
+    def get_hierarchy(self: "SqlObjectView") -> List[SqlObject]:
+        # each expanded object view knows the view it was expanded from so the
+        # hierarchy is found by following those links up to a top-level object
+        # rather than scanning back through every view above this one
+        object_hierarchy: List[SqlObject] = []
+        current_view: SqlObjectView | None = self
+        while current_view is not None:
+            object_hierarchy.append(current_view.sql_object)
+            current_view = current_view.parent_view
+
+        object_hierarchy.reverse()
+        return object_hierarchy
+
+    @property
+    def index(self: "SqlObjectView") -> int:
+        # the position is looked up on demand so that expanding or collapsing an
+        # object doesn't have to renumber every object view below it
+        return self.parent.children.index(self)
+
     def toggle_collapse(self: "SqlObjectView") -> None:
         if len(self.sql_object.children) == 0:
             return
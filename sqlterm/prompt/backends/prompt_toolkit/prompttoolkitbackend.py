@@ -1,9 +1,20 @@
 import functools
+import itertools
 import os
 import shutil
 import time
 import traceback
-from typing import Any, Callable, Dict, Iterable, List, Tuple, Type
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Type,
+)
 
 from prompt_toolkit import (
     print_formatted_text,
@@ -33,7 +44,6 @@ from prompt_toolkit.styles import (
 from prompt_toolkit.validation import Validator, ValidationError
 from pygments.styles import get_style_by_name, get_all_styles
 from pygments.token import Token
-import sqlparse
 
 from .... import constants
 from ...abstract.promptbackend import PromptBackend
@@ -43,12 +53,108 @@ from .controls import ObjectBrowser, SqlObjectView, SelectionCursorShapeConfig
 from ...dataclasses import InputModel, SqlReference, SqlStatusDetails, Suggestion
 from ...enums import PromptType
 from ...exceptions import UserExit
-from ....sql.generic.dataclasses import SqlObject, SqlStructure
+from ....sql.generic.dataclasses import SqlStructure
 from ....sql.generic.enums.sqldialect import SqlDialect
 from ....sql.exceptions import DialectException, DisconnectedException
 from .sqltermlexer import SqlTermLexer
 from .styles import sqlterm_styles
 
+# prefixes that mark input as a shell or sqlterm command rather than sql. each is a
+# single character so only the first character of the input needs to be checked
+_command_prefixes: FrozenSet[str] = frozenset(
+    (constants.PREFIX_SHELL_COMMAND, constants.PREFIX_SQLTERM_COMMAND)
+)
+
+# padding strings of every length needed to indent a line to the next tab stop
+_tab_stop_padding: Tuple[str, ...] = tuple(
+    " " * space_count for space_count in range(constants.SPACES_IN_TAB + 1)
+)
+
+
+# NOTE: sqlparse is slow to format long statements. the result only depends on the
+# text being formatted so it's cached to keep repeated formatting of the same
+# statement (e.g., resubmitting it from the history) from paying that cost again
+@functools.lru_cache(maxsize=128)
+def _format_sql(sql_text: str) -> str:
+    # NOTE: sqlparse is imported here as it's only needed when autoformat is enabled
+    # and is relatively slow to import. it would otherwise add to sqlterm's startup
+    import sqlparse  # pylint: disable=import-outside-toplevel
+
+    return sqlparse.format(
+        sql_text,
+        reindent=True,
+        indent_columns=True,
+        indent_width=4,
+        keyword_case="upper",
+        use_space_around_operators=True,
+    )
+
+
+# NOTE: checking for a pygments style walks every installed style including those
+# provided by plugins through package entry points. the installed styles can't
+# change while sqlterm is running so the lookup and the conversion of a style for
+# prompt_toolkit are both cached
+@functools.lru_cache(maxsize=32)
+def _get_pygments_style(color_scheme: str) -> Type | None:
+    if color_scheme in get_all_styles():
+        return get_style_by_name(color_scheme)
+
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def _style_from_pygments_cls(style_class: Type) -> Style:
+    return style_from_pygments_cls(style_class)
+
+
+# NOTE: the continuation prompt is rebuilt for every line of a multiline statement on
+# every render even though it only depends on its arguments
+@functools.lru_cache(maxsize=256)
+def _get_prompt_continuation(
+    width: int, line_number: int, is_soft_wrap: bool
+) -> List[Tuple[str, str]]:
+    if not is_soft_wrap and len(line_number_str := str(line_number + 1)) < width - 1:
+        return [
+            (
+                "class:line-number",
+                line_number_str.rjust(width - 2) + "  ",
+            )
+        ]
+
+    return [("", "...".ljust(width))]
+
+
+# style applied on top of the session style for text typed into input model prompts
+_input_model_text_style: Style = Style.from_dict({"": "fg:darkgray"})
+
+
+# NOTE: session styles are themselves cached and shared so the merged style for input
+# model prompts only needs to be built once for each of them
+@functools.lru_cache(maxsize=32)
+def _get_input_model_style(session_style: BaseStyle) -> BaseStyle:
+    return merge_styles([session_style, _input_model_text_style])
+
+
+# NOTE: validating a color means parsing it into a throwaway style. the same handful
+# of color strings tend to be checked over and over so the result is cached
+@functools.lru_cache(maxsize=256)
+def _is_valid_color(color: str) -> bool:
+    try:
+        Style.from_dict({"": color})
+        return True
+    except:
+        return False
+
+
+_yes_no_values: Dict[str, bool] = {"y": True, "yes": True, "n": False, "no": False}
+
+
+def _validate_yes_no(user_input: str) -> str | None:
+    if user_input.lower().strip() not in _yes_no_values:
+        return "Error: Please enter 'yes' or 'no'"
+
+    return None
+
 
 class _InputModelCompleter(Completer):
     __completer_func: Callable[[str, str, int], List[Suggestion]] | None
@@ -61,23 +167,25 @@ class _InputModelCompleter(Completer):
 
         self.__completer_func = completer_func
 
-    def get_completions(self: "_InputModelCompleter", document: Document, _):
+    def get_completions(
+        self: "_InputModelCompleter", document: Document, _
+    ) -> Iterator[Completion]:
         if self.__completer_func is None:
-            return []
+            return
 
         word_before_cursor = document.get_word_before_cursor()
         input_model_suggestions: List[Suggestion] = self.__completer_func(
             document.text, word_before_cursor, document.cursor_position_col
         )
 
-        return [
-            Completion(
+        # yield each completion as it's built so that prompt_toolkit can start
+        # displaying them without waiting for the entire list
+        for suggestion in input_model_suggestions:
+            yield Completion(
                 suggestion.content,
                 start_position=suggestion.position,
                 display_meta=suggestion.suffix,
             )
-            for suggestion in input_model_suggestions
-        ]
 
 
 class _InputModelValidator(Validator):
@@ -95,22 +203,33 @@ class _InputModelValidator(Validator):
 
 
 class PromptToolkitBackend(PromptBackend):
+    # pylint: disable=too-many-instance-attributes
+
     __completer: DefaultCompleter
     __lexer: SqlTermLexer
     __session: PromptSession
     __current_statement_index: int
     __prompt_color: str
+    # cached terminal height and the time it was read at
+    __terminal_lines: Tuple[int, float]
+    # cached bottom toolbar fragments and the status they were built for
+    __bottom_toolbar: Tuple[List[Tuple], SqlStatusDetails | None]
 
+    # NOTE: only dialects that don't escape identifiers with the ansi double quote
+    # need to be listed here
     __dialect_escape_chars: Dict[SqlDialect, str] = {
-        SqlDialect.GENERIC: '"',
         SqlDialect.MYSQL: "`",
-        SqlDialect.ORACLE: '"',
-        SqlDialect.POSTGRES: '"',
-        SqlDialect.REDSHIFT: '"',
-        SqlDialect.SQLITE: '"',
-        SqlDialect.TSQL: '"',
     }
 
+    # NOTE: default and merged session styles are shared between instances. they're
+    # keyed by the pygments style class and prompt color they were built from
+    __default_styles: Dict[Tuple[Type, str | None], BaseStyle] = {}
+    __session_styles: Dict[Tuple[Type, str | None], BaseStyle] = {}
+
+    # NOTE: the yes/no validator holds no state so a single instance is shared by
+    # every yes/no prompt
+    __yes_no_validator: Validator = _InputModelValidator(_validate_yes_no)
+
     def __init__(
         self: "PromptToolkitBackend",
         config: SqlTermConfig,
@@ -131,18 +250,15 @@ class PromptToolkitBackend(PromptBackend):
             lexer=self.__lexer,
             multiline=True,
             prompt_continuation=self._prompt_continuation,  # type: ignore
-            style=merge_styles(
-                [
-                    self._default_style,
-                    style_from_pygments_cls(self._get_style_for_config()),
-                ]
-            ),
+            style=self._get_session_style(),
             completer=self.__completer,
             cursor=SelectionCursorShapeConfig(),
             color_depth=self._default_color_depth,
             **kwargs,
         )
         self.__current_statement_index = 0
+        self.__terminal_lines = (0, -constants.TERMINAL_SIZE_CACHE_SECONDS)
+        self.__bottom_toolbar = ([], None)
         shortcuts.clear()
 
         self.__session.default_buffer.on_completions_changed.add_handler(
@@ -158,7 +274,9 @@ class PromptToolkitBackend(PromptBackend):
     def clear_completions(self: "PromptToolkitBackend") -> None:
         self.__completer.clear_completions()
 
-    @property
+    # NOTE: the environment this depends on doesn't change while sqlterm is running
+    # so it only needs to be inspected once
+    @functools.cached_property
     def _default_color_depth(self: "PromptToolkitBackend") -> ColorDepth:
         # use 24-bit color on windows
         if os.name == "nt":
@@ -192,17 +310,12 @@ class PromptToolkitBackend(PromptBackend):
 
         bindings: KeyBindings = KeyBindings()
 
-        def format_sql_document(sql_document: Document) -> Document:
-            return Document(
-                sqlparse.format(
-                    sql_document.text,
-                    reindent=True,
-                    indent_columns=True,
-                    indent_width=4,
-                    keyword_case="upper",
-                    use_space_around_operators=True,
-                )
-            )
+        def format_buffer(buffer: Buffer) -> None:
+            # NOTE: formatting is memoized by _format_sql(). the document is only
+            # replaced if formatting actually changed the text so that formatting
+            # an already formatted statement doesn't rebuild the buffer's document
+            if (formatted_text := _format_sql(buffer.text)) != buffer.text:
+                buffer.document = Document(formatted_text)
 
         def insert_newline(buffer: Buffer) -> None:
             if buffer.document.current_line_after_cursor:
@@ -210,50 +323,55 @@ class PromptToolkitBackend(PromptBackend):
                 buffer.insert_text("\n")
             else:
                 current_line: str = buffer.document.current_line_before_cursor.rstrip()
-                buffer.insert_text("\n")
 
                 # insert spaces to match the previous indentation level. if there's a semicolon,
                 # dedent one level
-                space_count: int = 0
-                for char in current_line:
-                    if char.isspace():
-                        space_count += 1
-                    else:
-                        break
-
-                buffer.insert_text(
-                    " "
-                    * (
-                        space_count
-                        # auto-dedent when it looks like a statement is completed
-                        - (
-                            constants.SPACES_IN_TAB
-                            if current_line.strip().endswith(";")
-                            else 0
-                        )
-                    )
-                )
+                space_count: int = len(current_line) - len(current_line.lstrip())
 
-        def selected_lines(event: KeyPressEvent) -> List[int]:
-            start_pos, end_pos = event.current_buffer.document.selection_range()
+                # auto-dedent when it looks like a statement is completed. the line was
+                # already stripped on the right so its last character can be checked as-is
+                if current_line.endswith(";"):
+                    space_count = max(0, space_count - constants.SPACES_IN_TAB)
 
-            begin_line: int = -1
-            end_line: int = -1
-            char_index: int = 0
+                # insert the newline and indentation together so that the buffer is only
+                # modified once
+                buffer.insert_text("\n" + " " * space_count)
 
-            for index, line in enumerate(event.current_buffer.document.lines):
-                if start_pos in range(char_index, char_index + len(line) + 1):
-                    begin_line = index
-                if end_pos in range(char_index, char_index + len(line) + 1):
-                    end_line = index
-
-                char_index += len(line) + 1
+        def selected_lines(event: KeyPressEvent) -> List[int]:
+            document: Document = event.current_buffer.document
+            start_pos, end_pos = document.selection_range()
 
-                if begin_line > -1 and end_line > -1:
-                    break
+            # the document caches the index each line starts at so the lines containing
+            # the start and end of the selection are found with a binary search rather
+            # than by walking every line before them
+            begin_line, _ = document.translate_index_to_position(start_pos)
+            end_line, _ = document.translate_index_to_position(end_pos)
 
             return list(range(begin_line, end_line + 1))
 
+        def transform_selected_lines(
+            buffer: Buffer, line_indexes: List[int], transform: Callable[[str], str]
+        ) -> None:
+            # NOTE: unlike Buffer.transform_lines(), only the text spanning the target
+            # lines is split and rejoined. the text before and after them is sliced
+            # as-is rather than splitting and rejoining every line in the buffer
+            document: Document = buffer.document
+            block_start: int = document.translate_row_col_to_index(line_indexes[0], 0)
+            block_end: int = document.translate_row_col_to_index(
+                line_indexes[-1], 0
+            ) + len(document.lines[line_indexes[-1]])
+
+            buffer.text = (
+                document.text[:block_start]
+                + "\n".join(
+                    [
+                        transform(line)
+                        for line in document.text[block_start:block_end].split("\n")
+                    ]
+                )
+                + document.text[block_end:]
+            )
+
         # NOTE: we have to have our own bindings here as the Alt-Up/Down combination can perform
         # a selection that won't cancel for whatever reason. this ensures that the arrow keys will
         # always cancel an active selection without a shift modifier
@@ -279,56 +397,36 @@ class PromptToolkitBackend(PromptBackend):
 
         @bindings.add(Keys.Backspace)
         def binding_backspace(event: KeyPressEvent) -> None:
+            buffer: Buffer = event.current_buffer
+
             # check if there is text currently selected that the user is trying to
             # delete by pressing backspace
-            if event.current_buffer.document.selection is not None:
-                buffer = event.current_buffer
-                selection_start, selection_end = buffer.document.selection_range()
+            if buffer.document.selection is not None:
+                document: Document = buffer.document
+                selection_start, selection_end = document.selection_range()
 
+                # replace the text and place the cursor in a single document update
+                # rather than setting the cursor separately afterwards
                 buffer.exit_selection()
                 buffer.document = Document(
-                    buffer.document.text[:selection_start]
-                    + buffer.document.text[selection_end:]
+                    document.text[:selection_start] + document.text[selection_end:],
+                    cursor_position=selection_start,
                 )
 
-                buffer.cursor_position = selection_start
-                buffer.selection_state = None
-
                 return
 
             # check if the preceding set of four characters is all spaces. if so,
             # this is a tab equivalent and should be removed as a group
+            current_line_before_cursor: str = buffer.document.current_line_before_cursor
             if (
-                (
-                    preceding_line_length := len(
-                        event.app.current_buffer.document.current_line_before_cursor
-                    )
-                )
-                > 0
-                and preceding_line_length % 4 == 0
-                and all(
-                    char == " "
-                    for char in event.app.current_buffer.document.current_line_before_cursor[
-                        preceding_line_length
-                        - (
-                            constants.SPACES_IN_TAB
-                            if preceding_line_length % constants.SPACES_IN_TAB == 0
-                            else preceding_line_length % constants.SPACES_IN_TAB
-                        ) :
-                    ]
-                )
+                current_line_before_cursor.endswith(constants.SPACES_IN_TAB_TEXT)
+                and len(current_line_before_cursor) % constants.SPACES_IN_TAB == 0
             ):
                 # remove the tab equivalent
-                event.current_buffer.delete_before_cursor(
-                    (
-                        constants.SPACES_IN_TAB
-                        if preceding_line_length % constants.SPACES_IN_TAB == 0
-                        else preceding_line_length % constants.SPACES_IN_TAB
-                    )
-                )
+                buffer.delete_before_cursor(constants.SPACES_IN_TAB)
             else:
                 # otherwise, just remove an individual character like a regular backspace
-                event.current_buffer.delete_before_cursor()
+                buffer.delete_before_cursor()
 
         @bindings.add(Keys.ControlA)
         def binding_ctrl_a(event: KeyPressEvent) -> None:
@@ -345,24 +443,25 @@ class PromptToolkitBackend(PromptBackend):
         @bindings.add(Keys.ControlB)
         def binding_ctrl_b(event: KeyPressEvent) -> None:
             try:
-                dialect_escape_char: str = (
-                    self.__dialect_escape_chars[self.dialect]
-                    if self.dialect in self.__dialect_escape_chars
-                    else '"'
+                dialect_escape_char: str = self.__dialect_escape_chars.get(
+                    self.dialect, '"'
                 )
                 object_browser_result: SqlReference | None = (
                     self.display_object_browser(show_loading=False)
                 )
 
                 if object_browser_result is not None:
+                    escaped_escape_char: str = dialect_escape_char * 2
                     event.current_buffer.insert_text(
                         ".".join(
-                            dialect_escape_char
-                            + sql_object.name.replace(
-                                dialect_escape_char, dialect_escape_char * 2
-                            )
-                            + dialect_escape_char
-                            for sql_object in object_browser_result.hierarchy
+                            [
+                                dialect_escape_char
+                                + sql_object.name.replace(
+                                    dialect_escape_char, escaped_escape_char
+                                )
+                                + dialect_escape_char
+                                for sql_object in object_browser_result.hierarchy
+                            ]
                         )
                     )
             except (DisconnectedException, DialectException):
@@ -395,41 +494,43 @@ class PromptToolkitBackend(PromptBackend):
         def binding_enter(event: KeyPressEvent) -> None:
             # check for a blank line or a shell or sqlterm command (also, show
             # help if the user enters 'help')
-            current_text_stripped: str = event.current_buffer.text.strip()
-            if len(current_text_stripped) == 0 or current_text_stripped[:1] in (
-                constants.PREFIX_SHELL_COMMAND,
-                constants.PREFIX_SQLTERM_COMMAND,
+            buffer: Buffer = event.current_buffer
+            current_text_stripped: str = buffer.text.strip()
+            if (
+                len(current_text_stripped) == 0
+                or current_text_stripped[0] in _command_prefixes
             ):
-                event.current_buffer.validate_and_handle()
+                buffer.validate_and_handle()
                 return
 
-            if current_text_stripped.lower() == "help":
-                event.current_buffer.text = "%help"
-                event.current_buffer.validate_and_handle()
+            # only lowercase the text if it could be 'help' instead of lowercasing the
+            # entire buffer each time enter is pressed
+            if (
+                len(current_text_stripped) == len("help")
+                and current_text_stripped.lower() == "help"
+            ):
+                buffer.text = "%help"
+                buffer.validate_and_handle()
                 return
 
             # check if this is a syntactically complete SQL query we can execute
-            if (
+            document: Document = buffer.document
+            if current_text_stripped.endswith(";") and (
                 # if the current line is blank and the most recent character is ';'
-                len(event.current_buffer.document.current_line) == 0
-                and event.current_buffer.document.on_last_line
-                and current_text_stripped.endswith(";")
-            ) or (
+                (len(document.current_line) == 0 and document.on_last_line)
                 # if the current line is the first and only one and ends with a ';'
-                event.current_buffer.document.line_count == 1
-                and current_text_stripped.endswith(";")
-                and event.current_buffer.cursor_position
-                == len(event.current_buffer.document.text)
+                or (
+                    document.line_count == 1
+                    and document.cursor_position == len(document.text)
+                )
             ):
                 # check if the user has autoformat enabled and format if so
                 if self.config.autoformat:
-                    event.current_buffer.document = format_sql_document(
-                        event.current_buffer.document
-                    )
+                    format_buffer(buffer)
 
-                event.current_buffer.validate_and_handle()
+                buffer.validate_and_handle()
             else:
-                insert_newline(event.current_buffer)
+                insert_newline(buffer)
 
         @bindings.add(Keys.Escape)
         def binding_escape(event: KeyPressEvent) -> None:
@@ -441,59 +542,60 @@ class PromptToolkitBackend(PromptBackend):
 
         @bindings.add(Keys.Escape, Keys.Down)
         def binding_alt_down_arrow(event: KeyPressEvent) -> None:
+            buffer: Buffer = event.current_buffer
+            document: Document = buffer.document
+
             # get a list of the currently selected lines
             orig_cursor_position: int | None = (
-                event.current_buffer.document.selection.original_cursor_position
-                if event.current_buffer.document.selection is not None
+                document.selection.original_cursor_position
+                if document.selection is not None
                 else None
             )
             (
                 selection_start,
                 selection_end,
-            ) = event.current_buffer.document.selection_range()
+            ) = document.selection_range()
             line_indexes: List[int] = selected_lines(event)
 
             # check if the first selected line is the last overall line and do nothing if so
-            if line_indexes[-1] == len(event.app.current_buffer.document.lines) - 1:
+            if line_indexes[-1] == len(document.lines) - 1:
                 return
 
-            # swap the current lines with the next one
-            next_line: str = event.app.current_buffer.document.lines[
-                line_indexes[-1] + 1
-            ]
-            current_lines: List[str] = [
-                event.app.current_buffer.document.lines[line_index]
-                for line_index in line_indexes
-            ]
-            cursor_col: int = event.app.current_buffer.document.cursor_position_col
-            cursor_line: int = event.app.current_buffer.document.cursor_position_row
-
-            event.app.current_buffer.text = "\n".join(
-                event.app.current_buffer.document.lines[: line_indexes[0]]
-                + [next_line, *current_lines]
-                + event.app.current_buffer.document.lines[line_indexes[-1] + 2 :]
+            # swap the current lines with the next one. only the text spanning those
+            # lines is rearranged; the text before and after them is sliced as-is
+            # instead of rejoining every line in the buffer
+            next_line: str = document.lines[line_indexes[-1] + 1]
+            block_start: int = document.translate_row_col_to_index(line_indexes[0], 0)
+            next_line_start: int = document.translate_row_col_to_index(
+                line_indexes[-1] + 1, 0
+            )
+            cursor_col: int = document.cursor_position_col
+            cursor_line: int = document.cursor_position_row
+
+            buffer.text = (
+                document.text[:block_start]
+                + next_line
+                + "\n"
+                + document.text[block_start : next_line_start - 1]
+                + document.text[next_line_start + len(next_line) :]
             )
 
             # check if there was originally a selection
             if orig_cursor_position is None:
                 # seek to column 0
-                event.app.current_buffer.cursor_position -= (
-                    event.app.current_buffer.document.cursor_position_col
-                )
+                buffer.cursor_position -= buffer.document.cursor_position_col
 
                 # check if the cursor moved down or not. if it didn't, seek down a line
-                if cursor_line == event.app.current_buffer.document.cursor_position_row:
-                    event.app.current_buffer.cursor_down()
+                if cursor_line == buffer.document.cursor_position_row:
+                    buffer.cursor_down()
 
                 # seek to the old column where the cursor was
-                event.app.current_buffer.cursor_right(cursor_col)
+                buffer.cursor_right(cursor_col)
             else:
                 # if there was a selection, recreate the selection on the new relative lines
-                event.app.current_buffer.cursor_position = (
-                    orig_cursor_position + len(next_line) + 1
-                )
-                event.app.current_buffer.start_selection()
-                event.app.current_buffer.cursor_position = (
+                buffer.cursor_position = orig_cursor_position + len(next_line) + 1
+                buffer.start_selection()
+                buffer.cursor_position = (
                     selection_start + len(next_line) + 1
                     if selection_start < orig_cursor_position
                     else selection_end + len(next_line) + 1
@@ -501,64 +603,67 @@ class PromptToolkitBackend(PromptBackend):
 
         @bindings.add(Keys.Escape, Keys.Up)
         def binding_alt_up_arrow(event: KeyPressEvent) -> None:
+            buffer: Buffer = event.current_buffer
+            document: Document = buffer.document
+
             # check if we're already on the first line and do nothing if so
-            if event.app.current_buffer.document.on_first_line:
+            if document.on_first_line:
                 return
 
             # get a list of the currently selected lines
             orig_cursor_position: int | None = (
-                event.current_buffer.document.selection.original_cursor_position
-                if event.current_buffer.document.selection is not None
+                document.selection.original_cursor_position
+                if document.selection is not None
                 else None
             )
             (
                 selection_start,
                 selection_end,
-            ) = event.current_buffer.document.selection_range()
+            ) = document.selection_range()
             line_indexes: List[int] = selected_lines(event)
 
             # check if the first selected line is the first overall line and do nothing if so
             if line_indexes[0] == 0:
                 return
 
-            # swap the current line with the previous one
-            prev_line: str = event.app.current_buffer.document.lines[
-                line_indexes[0] - 1
-            ]
-            # current_line: str = event.app.current_buffer.document.current_line
-            current_lines: List[str] = [
-                event.app.current_buffer.document.lines[line_index]
-                for line_index in line_indexes
-            ]
-            cursor_col: int = event.app.current_buffer.document.cursor_position_col
-            cursor_line: int = event.app.current_buffer.document.cursor_position_row
-
-            event.app.current_buffer.text = "\n".join(
-                event.app.current_buffer.document.lines[: line_indexes[0] - 1]
-                + [*current_lines, prev_line]
-                + event.app.current_buffer.document.lines[line_indexes[-1] + 1 :]
+            # swap the current lines with the previous one. only the text spanning
+            # those lines is rearranged; the text before and after them is sliced
+            # as-is instead of rejoining every line in the buffer
+            prev_line: str = document.lines[line_indexes[0] - 1]
+            prev_line_start: int = document.translate_row_col_to_index(
+                line_indexes[0] - 1, 0
+            )
+            block_start: int = prev_line_start + len(prev_line) + 1
+            block_end: int = document.translate_row_col_to_index(
+                line_indexes[-1], 0
+            ) + len(document.lines[line_indexes[-1]])
+            cursor_col: int = document.cursor_position_col
+            cursor_line: int = document.cursor_position_row
+
+            buffer.text = (
+                document.text[:prev_line_start]
+                + document.text[block_start:block_end]
+                + "\n"
+                + prev_line
+                + document.text[block_end:]
             )
 
             # check if there was originally a selection
             if orig_cursor_position is None:
                 # seek to column 0
-                event.app.current_buffer.cursor_position -= (
-                    event.app.current_buffer.document.cursor_position_col
-                )
+                buffer.cursor_position -= buffer.document.cursor_position_col
 
                 # check if the cursor moved up or not. if it didn't, seek up a line
-                if cursor_line == event.app.current_buffer.document.cursor_position_row:
-                    event.app.current_buffer.cursor_up()
+                if cursor_line == buffer.document.cursor_position_row:
+                    buffer.cursor_up()
 
                 # seek to the old column where the cursor was
-                event.app.current_buffer.cursor_right(cursor_col)
+                buffer.cursor_right(cursor_col)
             else:
                 # if there was a selection, recreate the selection on the new relative lines
-                event.app.current_buffer.cursor_position = (
-                    orig_cursor_position - len(prev_line) - 1
-                )
-                event.app.current_buffer.start_selection()
-                event.app.current_buffer.cursor_position = (
+                buffer.cursor_position = orig_cursor_position - len(prev_line) - 1
+                buffer.start_selection()
+                buffer.cursor_position = (
                     selection_start - len(prev_line) - 1
                     if selection_start < orig_cursor_position
                     else selection_end - len(prev_line) - 1
@@ -567,16 +672,16 @@ class PromptToolkitBackend(PromptBackend):
         @bindings.add(Keys.PageDown)
         def binding_page_down(event: KeyPressEvent) -> None:
             event.current_buffer.exit_selection()
-            event.current_buffer.cursor_down(count=shutil.get_terminal_size().lines)
+            event.current_buffer.cursor_down(count=self._get_terminal_lines())
 
         @bindings.add(Keys.PageUp)
         def binding_page_up(event: KeyPressEvent) -> None:
             event.current_buffer.exit_selection()
-            event.current_buffer.cursor_up(count=shutil.get_terminal_size().lines)
+            event.current_buffer.cursor_up(count=self._get_terminal_lines())
 
         @bindings.add(Keys.ShiftLeft)
         def binding_shift_left(event: KeyPressEvent) -> None:
-            buffer = event.app.current_buffer
+            buffer: Buffer = event.current_buffer
 
             # check that we're not at the beginning of the buffer already
             if buffer.document.cursor_position == 0:
@@ -613,11 +718,11 @@ class PromptToolkitBackend(PromptBackend):
             # move the cursor one to the left to select the previous character. we want to
             # do this when we started a selection or when there's an active selection that
             # is not at the start of its line
-            event.app.current_buffer.cursor_left()
+            buffer.cursor_left()
 
         @bindings.add(Keys.ShiftRight)
         def binding_shift_right(event: KeyPressEvent) -> None:
-            buffer = event.app.current_buffer
+            buffer: Buffer = event.current_buffer
 
             # check that we're not at the end of the buffer already
             if buffer.document.is_cursor_at_the_end:
@@ -644,7 +749,7 @@ class PromptToolkitBackend(PromptBackend):
             # move the cursor one to the right to select the next character. we want to
             # do this when we started a selection or when there's an active selection that
             # is not at the end of its line
-            event.app.current_buffer.cursor_right()
+            buffer.cursor_right()
 
         @bindings.add(Keys.Tab)
         def binding_tab(event: KeyPressEvent) -> None:
@@ -662,9 +767,9 @@ class PromptToolkitBackend(PromptBackend):
 
             # check if this is a shell or sqlterm command
             current_text_stripped: str = current_buffer.text.strip()
-            if len(current_text_stripped) == 0 or current_text_stripped[:1] in (
-                constants.PREFIX_SHELL_COMMAND,
-                constants.PREFIX_SQLTERM_COMMAND,
+            if (
+                len(current_text_stripped) == 0
+                or current_text_stripped[0] in _command_prefixes
             ):
                 current_buffer.start_completion()
                 return
@@ -674,18 +779,13 @@ class PromptToolkitBackend(PromptBackend):
                 current_buffer.selection_state is not None
                 and len(target_lines := selected_lines(event)) > 1
             ):
-                current_buffer.text = current_buffer.transform_lines(
+                transform_selected_lines(
+                    current_buffer,
                     target_lines,
-                    lambda line: (
-                        " "
-                        * (
-                            (
-                                constants.SPACES_IN_TAB
-                                - (len(line) - len(line.lstrip(" ")))
-                                % constants.SPACES_IN_TAB
-                            )
-                        )
-                    )
+                    lambda line: _tab_stop_padding[
+                        constants.SPACES_IN_TAB
+                        - (len(line) - len(line.lstrip(" "))) % constants.SPACES_IN_TAB
+                    ]
                     + line,
                 )
 
@@ -715,49 +815,48 @@ class PromptToolkitBackend(PromptBackend):
 
         @bindings.add(Keys.BackTab)
         def binding_backtab(event: KeyPressEvent) -> None:
+            buffer: Buffer = event.current_buffer
+
             # check if there is a multiline selection and dedent all lines if so
             if (
-                event.app.current_buffer.selection_state is not None
+                buffer.selection_state is not None
                 and len(target_lines := selected_lines(event)) > 1
             ):
-                event.current_buffer.text = event.current_buffer.transform_lines(
+                transform_selected_lines(
+                    buffer,
                     target_lines,
-                    lambda line: line[4:] if line.startswith(" " * 4) else line,
+                    lambda line: (
+                        line[constants.SPACES_IN_TAB :]
+                        if line.startswith(constants.SPACES_IN_TAB_TEXT)
+                        else line
+                    ),
                 )
 
                 # select all of the lines we dedented
-                event.app.current_buffer.cursor_position = 0
+                buffer.cursor_position = 0
                 if target_lines[0] > 0:
-                    event.app.current_buffer.cursor_down(target_lines[0])
-                event.app.current_buffer.start_selection()
-                event.app.current_buffer.cursor_down(target_lines[-1] - target_lines[0])
-                event.app.current_buffer.cursor_right(
-                    len(event.current_buffer.document.lines[target_lines[-1]])
-                )
+                    buffer.cursor_down(target_lines[0])
+                buffer.start_selection()
+                buffer.cursor_down(target_lines[-1] - target_lines[0])
+                buffer.cursor_right(len(buffer.document.lines[target_lines[-1]]))
 
                 return
 
             # map backtab to four leading spaces
-            if event.app.current_buffer.document.current_line.startswith(
-                " " * constants.SPACES_IN_TAB
-            ):
-                event.app.current_buffer.transform_current_line(
-                    lambda current_line: current_line[4:]
+            if buffer.document.current_line.startswith(constants.SPACES_IN_TAB_TEXT):
+                buffer.transform_current_line(
+                    lambda current_line: current_line[constants.SPACES_IN_TAB :]
                 )
 
         @bindings.add(Keys.F5)
         def binding_f5(event: KeyPressEvent) -> None:
             if self.config.autoformat:
-                event.current_buffer.document = format_sql_document(
-                    event.current_buffer.document
-                )
+                format_buffer(event.current_buffer)
             event.current_buffer.validate_and_handle()
 
         @bindings.add(Keys.ControlT)
         def binding_ctrl_t(event: KeyPressEvent) -> None:
-            event.current_buffer.document = format_sql_document(
-                event.current_buffer.document
-            )
+            format_buffer(event.current_buffer)
 
         @bindings.add(Keys.ControlR)
         def binding_ctrl_r(_: KeyPressEvent) -> None:
@@ -771,8 +870,20 @@ class PromptToolkitBackend(PromptBackend):
 
     @property
     def _default_style(self: "PromptToolkitBackend") -> BaseStyle:
+        style_for_config: Type = self._get_style_for_config()
+        style_key: Tuple[Type, str | None] = (style_for_config, self.__prompt_color)
+
+        if style_key not in self.__default_styles:
+            self.__default_styles[style_key] = self._build_default_style(
+                style_for_config
+            )
+
+        return self.__default_styles[style_key]
+
+    def _build_default_style(
+        self: "PromptToolkitBackend", style_for_config: Type
+    ) -> BaseStyle:
         # pylint: disable=protected-access
-        style_for_config = self._get_style_for_config()
         colors: Dict[Any, str] = {
             token_type: (
                 style_for_config._styles[token_type][0]  # type: ignore
@@ -848,19 +959,21 @@ class PromptToolkitBackend(PromptBackend):
                 style=self.session.style,
             )
         else:
+            # NOTE: each traceback entry is emitted as its own fragment as it's
+            # formatted rather than building a list of entries and joining it into
+            # one string first. every fragment is newline-terminated so no end string
+            # is needed
             print_formatted_text(
                 FormattedText(
                     [
-                        (
-                            "class:error.message",
-                            "\n".join(
-                                line.strip("\n")
-                                for line in traceback.format_exception(exception)
-                            ),
-                        )
+                        ("class:error.message", line.strip("\n") + "\n")
+                        for line in traceback.TracebackException.from_exception(
+                            exception, compact=True
+                        ).format()
                     ]
                 ),
                 style=self._default_style,
+                end="",
             )
 
     def display_info(self: "PromptToolkitBackend", info: str) -> None:
@@ -888,26 +1001,27 @@ class PromptToolkitBackend(PromptBackend):
                 "There is no active SQL connection. Cannot display object browser."
             )
 
-        # wait until the the sql backend is done inspecting
+        # wait until the the sql backend is done inspecting. the wait returns as soon
+        # as inspection completes instead of polling on a fixed interval. when a
+        # loading indicator is shown, it's advanced each time the wait times out
         self.hide_cursor()
-        load_char_offset: int = 0
-        while self.parent.context.backends.sql.inspecting:
-            if show_loading:
-                self.display_progress(
-                    constants.PROGRESS_CHARACTERS[load_char_offset],
-                    " Inspecting database objects...",
-                )
-
-                load_char_offset = (load_char_offset + 1) % len(
-                    constants.PROGRESS_CHARACTERS
-                )
-
-            time.sleep(0.1)
+        progress_characters: Iterator[str] = itertools.cycle(
+            constants.PROGRESS_CHARACTERS
+        )
+        while not self.parent.context.backends.sql.wait_for_inspection(
+            timeout=constants.PROGRESS_INTERVAL_SECONDS if show_loading else None
+        ):
+            self.display_progress(
+                next(progress_characters), " Inspecting database objects..."
+            )
 
+        # clear the loading indicator with a single write rather than three
         if show_loading:
-            print("\r", end="")
-            print(" " * (shutil.get_terminal_size().columns - 1), end="")
-            print("\r", end="")
+            print(
+                f"\r{' ' * (shutil.get_terminal_size().columns - 1)}\r",
+                end="",
+                flush=True,
+            )
 
         self.show_cursor()
 
@@ -942,8 +1056,14 @@ class PromptToolkitBackend(PromptBackend):
     def _get_bottom_toolbar(self: "PromptToolkitBackend") -> List[Tuple]:
         status_details: SqlStatusDetails = self.parent.context.backends.sql.get_status()
 
+        # NOTE: the toolbar is redrawn on every render so only rebuild its fragments
+        # when the connection status has actually changed
+        bottom_toolbar, bottom_toolbar_status = self.__bottom_toolbar
+        if status_details == bottom_toolbar_status:
+            return bottom_toolbar
+
         if status_details.connected:
-            return [
+            bottom_toolbar = [
                 (
                     "class:bottom-toolbar.icon",
                     "\U0001f5a7 ",
@@ -952,11 +1072,14 @@ class PromptToolkitBackend(PromptBackend):
                 ("class:bottom-toolbar.info", " "),
                 ("class:bottom-toolbar.text", f"({status_details.dialect})"),
             ]
+        else:
+            bottom_toolbar = [
+                ("class:bottom-toolbar.icon", "\u2a2f"),
+                ("class:bottom-toolbar.info", " Disconnected"),
+            ]
 
-        return [
-            ("class:bottom-toolbar.icon", "\u2a2f"),
-            ("class:bottom-toolbar.info", " Disconnected"),
-        ]
+        self.__bottom_toolbar = (bottom_toolbar, status_details)
+        return bottom_toolbar
 
     def get_command(
         self: "PromptToolkitBackend", initial_input: str | None = None
@@ -978,12 +1101,26 @@ class PromptToolkitBackend(PromptBackend):
         except KeyboardInterrupt:
             return ""
 
+    def _get_session_style(self: "PromptToolkitBackend") -> BaseStyle:
+        style_for_config: Type = self._get_style_for_config()
+        style_key: Tuple[Type, str | None] = (style_for_config, self.__prompt_color)
+
+        if style_key not in self.__session_styles:
+            self.__session_styles[style_key] = merge_styles(
+                [
+                    self._default_style,
+                    _style_from_pygments_cls(style_for_config),
+                ]
+            )
+
+        return self.__session_styles[style_key]
+
     def _get_style_for_config(self: "PromptToolkitBackend") -> Style:
         color_scheme: str = self.config.color_scheme
 
         # try getting a default pygments color scheme
-        if color_scheme in get_all_styles():
-            return get_style_by_name(self.config.color_scheme)
+        if (pygments_style := _get_pygments_style(color_scheme)) is not None:
+            return pygments_style
 
         # try getting a sqlterm builtin color scheme
         if color_scheme in sqlterm_styles:
@@ -992,31 +1129,28 @@ class PromptToolkitBackend(PromptBackend):
         # otherwise, default to tokyo-night-dark
         return sqlterm_styles["tokyo-night-dark"]
 
+    def _get_terminal_lines(self: "PromptToolkitBackend") -> int:
+        # NOTE: the terminal size is cached briefly so that holding down a paging key
+        # doesn't query the terminal again on every repeated keypress. a SIGWINCH
+        # handler isn't used to invalidate it as prompt_toolkit installs its own
+        terminal_lines, terminal_lines_time = self.__terminal_lines
+        current_time: float = time.monotonic()
+        if current_time - terminal_lines_time >= constants.TERMINAL_SIZE_CACHE_SECONDS:
+            terminal_lines = shutil.get_terminal_size().lines
+            self.__terminal_lines = (terminal_lines, current_time)
+
+        return terminal_lines
+
     def hide_cursor(self: "PromptToolkitBackend") -> None:
         self.session.app.output.hide_cursor()
 
     def is_valid_color(self: "PromptToolkitBackend", color: str) -> bool:
-        try:
-            Style.from_dict({"": color})
-            return True
-        except:
-            return False
+        return _is_valid_color(color)
 
     def _prompt_continuation(
         self, width: int, line_number: int, is_soft_wrap: bool
     ) -> List[Tuple[str, str]]:
-        if (
-            not is_soft_wrap
-            and len(line_number_str := str(line_number + 1)) < width - 1
-        ):
-            return [
-                (
-                    "class:line-number",
-                    line_number_str.rjust(width - 2) + "  ",
-                )
-            ]
-
-        return [("", "...".ljust(width))]
+        return _get_prompt_continuation(width, line_number, is_soft_wrap)
 
     def prompt_for(
         self: "PromptToolkitBackend", prompt_series: Iterable[InputModel]
@@ -1060,20 +1194,17 @@ class PromptToolkitBackend(PromptBackend):
             message=[("class:prompt-cell.bracket", input_model.prompt)],
             multiline=False,
             completer=completer,
+            # NOTE: input model completers may hit the filesystem or the odbc driver
+            # manager. running them off the ui thread keeps typing responsive, and
+            # prompt_toolkit drops results for text that has since changed
+            complete_in_thread=True,
             validator=validator,
             validate_while_typing=False,
-            style=merge_styles(
-                [
-                    self.session.style,  # type: ignore
-                    Style.from_dict({"": "fg:darkgray"}),
-                ]
-            ),
+            style=_get_input_model_style(self.session.style),  # type: ignore
             bottom_toolbar=self.session.bottom_toolbar,
             **kwargs,
         )
 
-    _yes_no_values: Dict[str, bool] = {"y": True, "yes": True, "n": False, "no": False}
-
     def _prompt_for_yes_no(
         self: "PromptToolkitBackend", input_model: InputModel
     ) -> bool:
@@ -1081,16 +1212,8 @@ class PromptToolkitBackend(PromptBackend):
             input_model.prompt + " [y/n] ", input_model.type, None, None
         )
 
-        def _yes_no_validator(user_input: str) -> str | None:
-            if user_input.lower().strip() not in self._yes_no_values:
-                return "Error: Please enter 'yes' or 'no'"
-
-            return None
-
-        return self._yes_no_values[
-            self._prompt_for_str(
-                modified_model, validator=_InputModelValidator(_yes_no_validator)
-            )
+        return _yes_no_values[
+            self._prompt_for_str(modified_model, validator=self.__yes_no_validator)
             .lower()
             .strip()
         ]
@@ -1101,12 +1224,7 @@ class PromptToolkitBackend(PromptBackend):
         self.__completer.refresh_structure(structure)
 
     def refresh_style(self: "PromptToolkitBackend") -> None:
-        self.__session.style = merge_styles(
-            [
-                self._default_style,
-                style_from_pygments_cls(self._get_style_for_config()),
-            ]
-        )
+        self.__session.style = self._get_session_style()
 
     @staticmethod
     def _select_first_completion(caller: Buffer) -> None:
@@ -1122,7 +1240,7 @@ class PromptToolkitBackend(PromptBackend):
         self.refresh_style()
 
     def show_cursor(self: "PromptToolkitBackend") -> None:
-        self.session.app.output.hide_cursor()
+        self.session.app.output.show_cursor()
 
     def _build_object_browser(
         self: "PromptToolkitBackend", structure: SqlStructure
@@ -1135,16 +1253,8 @@ class PromptToolkitBackend(PromptBackend):
                     ScrollablePane(
                         objects_hsplit := HSplit(
                             [
-                                SqlObjectView(root_object, index)
-                                for index, root_object in enumerate(
-                                    filter(
-                                        lambda root_object: not root_object.builtin,
-                                        sorted(
-                                            structure.objects,
-                                            key=lambda sql_object: sql_object.name,
-                                        ),
-                                    )
-                                )
+                                SqlObjectView(root_object)
+                                for root_object in structure.browsable_objects
                             ]
                         )
                     ),
@@ -1182,89 +1292,75 @@ class PromptToolkitBackend(PromptBackend):
         for child in objects_hsplit.children:
             child.parent = objects_hsplit
 
+        # NOTE: the sqlobjectviews expand and collapse by splicing this list in place
+        # so the bindings below can hold onto it rather than going through the hsplit
+        children: List[SqlObjectView] = objects_hsplit.children
+
         focus_index: int = 0
 
         @bindings.add(Keys.Enter)
         def binding_accept(event: KeyPressEvent) -> None:
             nonlocal focus_index
 
-            current_index: int = focus_index
-            current_hierarchy_level: int = objects_hsplit.children[
-                current_index
-            ].indent_level
-            object_hierarchy: List[SqlObject] = [
-                objects_hsplit.children[current_index].sql_object
-            ]
-            while current_hierarchy_level > 0 and current_index > 0:
-                current_object: SqlObjectView = objects_hsplit.children[current_index]
-                if (
-                    new_hierarchy_level := current_object.indent_level
-                ) < current_hierarchy_level:
-                    current_hierarchy_level = new_hierarchy_level
-                    object_hierarchy.append(current_object.sql_object)
-
-                current_index -= 1
-
-            object_hierarchy.reverse()
-            event.app.result = SqlReference(hierarchy=object_hierarchy)
+            event.app.result = SqlReference(
+                hierarchy=children[focus_index].get_hierarchy()
+            )
             event.app.exit()
 
         @bindings.add(Keys.Left)
         def binding_collapse_or_find_parent(event: KeyPressEvent) -> None:
             nonlocal focus_index
-            focus_index = objects_hsplit.children[focus_index].collapse_or_find_parent(
+            focus_index = children[focus_index].collapse_or_find_parent(
                 event.app.layout
             )
 
         @bindings.add(Keys.Right)
         def binding_expand(_: KeyPressEvent) -> None:
             nonlocal focus_index
-            objects_hsplit.children[focus_index].expand_if_collapsed()
+            children[focus_index].expand_if_collapsed()
 
         @bindings.add("space")
         def binding_expand_or_collapse(_: KeyPressEvent) -> None:
             nonlocal focus_index
-            objects_hsplit.children[focus_index].toggle_collapse()
+            children[focus_index].toggle_collapse()
 
         @bindings.add(Keys.ControlHome)
         def binding_first_entry(event: KeyPressEvent) -> None:
             nonlocal focus_index
             focus_index = 0
-            event.app.layout.focus(objects_hsplit.children[focus_index])
+            event.app.layout.focus(children[focus_index])
 
         @bindings.add(Keys.ControlEnd)
         def binding_last_entry(event: KeyPressEvent) -> None:
             nonlocal focus_index
-            focus_index = len(objects_hsplit.children) - 1
-            event.app.layout.focus(objects_hsplit.children[focus_index])
+            focus_index = len(children) - 1
+            event.app.layout.focus(children[focus_index])
 
         @bindings.add(Keys.Down)
         def binding_next_object(event: KeyPressEvent) -> None:
             nonlocal focus_index
-            focus_index = min(focus_index + 1, len(objects_hsplit.children) - 1)
-            event.app.layout.focus(objects_hsplit.children[focus_index])
+            focus_index = min(focus_index + 1, len(children) - 1)
+            event.app.layout.focus(children[focus_index])
 
         @bindings.add(Keys.PageDown)
         def binding_next_page(event: KeyPressEvent) -> None:
             nonlocal focus_index
-            terminal_height: int = shutil.get_terminal_size().lines
-            focus_index = min(
-                focus_index + terminal_height, len(objects_hsplit.children) - 1
-            )
-            event.app.layout.focus(objects_hsplit.children[focus_index])
+            terminal_height: int = self._get_terminal_lines()
+            focus_index = min(focus_index + terminal_height, len(children) - 1)
+            event.app.layout.focus(children[focus_index])
 
         @bindings.add(Keys.Up)
         def binding_previous_object(event: KeyPressEvent) -> None:
             nonlocal focus_index
             focus_index = max(0, focus_index - 1)
-            event.app.layout.focus(objects_hsplit.children[focus_index])
+            event.app.layout.focus(children[focus_index])
 
         @bindings.add(Keys.PageUp)
         def binding_previous_page(event: KeyPressEvent) -> None:
             nonlocal focus_index
-            terminal_height: int = shutil.get_terminal_size().lines
+            terminal_height: int = self._get_terminal_lines()
             focus_index = max(0, focus_index - terminal_height)
-            event.app.layout.focus(objects_hsplit.children[focus_index])
+            event.app.layout.focus(children[focus_index])
 
         @bindings.add(Keys.ControlC)
         @bindings.add(Keys.ControlD)
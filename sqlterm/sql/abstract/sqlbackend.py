@@ -1,7 +1,9 @@
 from abc import ABCMeta, abstractmethod
+import time
 from typing import Dict, List, Tuple
 
 from .query import Query
+from ... import constants
 from ...tables.abstract import TableBackend
 from ...prompt.dataclasses import SqlStatusDetails
 
@@ -146,6 +148,37 @@ class SqlBackend(metaclass=ABCMeta):
     @abstractmethod
     def set_alias(self: "SqlBackend", alias_name: str) -> None: ...
 
+    def wait_for_inspection(self: "SqlBackend", timeout: float | None = None) -> bool:
+        """
+        Blocks until this SqlBackend is done inspecting the remote server it is
+        connected to or until the provided timeout elapses. By default, this polls
+        the `inspecting` property. Backends that can wait on their inspection
+        directly should override this
+
+        Args:
+            timeout (float | None): The maximum number of seconds to wait for. If None,
+                waits until inspection is complete
+
+        Returns:
+            bool: Whether or not inspection is complete
+
+        Raises:
+            Nothing
+        """
+
+        deadline: float | None = None if timeout is None else time.monotonic() + timeout
+        while self.inspecting:
+            if deadline is None:
+                time.sleep(constants.PROGRESS_INTERVAL_SECONDS)
+                continue
+
+            if (remaining := deadline - time.monotonic()) <= 0:
+                return False
+
+            time.sleep(min(remaining, constants.PROGRESS_INTERVAL_SECONDS))
+
+        return True
+
 
 # pylint: disable=wrong-import-position
 from ... import sqlterm
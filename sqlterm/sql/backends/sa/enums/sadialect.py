@@ -1,5 +1,5 @@
 from enum import StrEnum
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 
 from ..... import constants
@@ -36,7 +36,11 @@ dialect_connection_parameters: Dict[SaDialect, Dict[str, Any]] = {
 }
 
 
-dialect_connection_prompt_models: Dict[SaDialect, ConnectionPromptModel] = {
-    SaDialect.MSSQL: MsSqlPromptModel(),
-    SaDialect.SQLITE: SqlitePromptModel(),
+# NOTE: prompt models are constructed fresh for each connection prompt so that any
+# state they gather while prompting (e.g., installed drivers) doesn't go stale
+dialect_connection_prompt_models: Dict[
+    SaDialect, Callable[[], ConnectionPromptModel]
+] = {
+    SaDialect.MSSQL: MsSqlPromptModel,
+    SaDialect.SQLITE: SqlitePromptModel,
 }
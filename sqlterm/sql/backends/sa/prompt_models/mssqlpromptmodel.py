@@ -17,21 +17,23 @@ class MsSqlPromptModel(ConnectionPromptModel):
     _default_port: int = 1433
     _username_valid_chars: str = string.ascii_letters + string.digits + " .-_\\"
 
-    @staticmethod
-    def driver_completer(user_input: str, _: str, __: int) -> List[Suggestion]:
+    __odbc_drivers: List[str] | None
+
+    def driver_completer(
+        self: "MsSqlPromptModel", user_input: str, _: str, __: int
+    ) -> List[Suggestion]:
         return [
             Suggestion(driver_name, -len(user_input), "driver")
-            for driver_name in pyodbc.drivers()
+            for driver_name in self._get_odbc_drivers()
             if driver_name.startswith(user_input) or user_input in driver_name
         ]
 
-    @staticmethod
-    def driver_validator(user_input: str) -> str | None:
+    def driver_validator(self: "MsSqlPromptModel", user_input: str) -> str | None:
         user_input = user_input.strip()
 
         # check that the provided string is a valid driver
         if len(user_input) != 0:
-            if user_input not in pyodbc.drivers():
+            if user_input not in self._get_odbc_drivers():
                 return "Error: ODBC driver with specified name not found"
 
         return None
@@ -133,43 +135,54 @@ class MsSqlPromptModel(ConnectionPromptModel):
             },  # type: ignore
         )
 
-    _input_models: List[InputModel] = [
-        InputModel(
-            prompt="Username: ",
-            type=PromptType.BASIC,
-            validator=username_validator,
-        ),
-        InputModel(
-            prompt="Password (blank for none): ",
-            type=PromptType.PASSWORD,
-        ),
-        InputModel(
-            prompt="Host: ",
-            type=PromptType.BASIC,
-            validator=host_validator,
-        ),
-        InputModel(
-            prompt="Port (blank for default): ",
-            type=PromptType.BASIC,
-            validator=port_validator,
-        ),
-        InputModel(
-            prompt="Database (blank for default): ",
-            type=PromptType.BASIC,
-        ),
-        InputModel(
-            prompt="Driver (blank for default): ",
-            type=PromptType.BASIC,
-            completer=driver_completer,
-        ),
-        InputModel(
-            prompt="Trust server certificate?",
-            type=PromptType.YES_NO,
-        ),
-    ]
-
     def __init__(self: "MsSqlPromptModel") -> None:
+        # NOTE: a new prompt model is built for each connection prompt. the installed
+        # odbc drivers are only listed once per prompt rather than on every keystroke
+        # in the driver completer
+        self.__odbc_drivers = None
+
+        input_models: List[InputModel] = [
+            InputModel(
+                prompt="Username: ",
+                type=PromptType.BASIC,
+                validator=self.username_validator,
+            ),
+            InputModel(
+                prompt="Password (blank for none): ",
+                type=PromptType.PASSWORD,
+            ),
+            InputModel(
+                prompt="Host: ",
+                type=PromptType.BASIC,
+                validator=self.host_validator,
+            ),
+            InputModel(
+                prompt="Port (blank for default): ",
+                type=PromptType.BASIC,
+                validator=self.port_validator,
+            ),
+            InputModel(
+                prompt="Database (blank for default): ",
+                type=PromptType.BASIC,
+            ),
+            InputModel(
+                prompt="Driver (blank for default): ",
+                type=PromptType.BASIC,
+                completer=self.driver_completer,
+            ),
+            InputModel(
+                prompt="Trust server certificate?",
+                type=PromptType.YES_NO,
+            ),
+        ]
+
         super().__init__(
-            input_models=self._input_models,
+            input_models=input_models,
             url_factory=MsSqlPromptModel.construct_url,
         )
+
+    def _get_odbc_drivers(self: "MsSqlPromptModel") -> List[str]:
+        if self.__odbc_drivers is None:
+            self.__odbc_drivers = pyodbc.drivers()
+
+        return self.__odbc_drivers
@@ -3,7 +3,6 @@ from typing import List, Tuple
 import psycopg2
 from psycopg2.extensions import cursor
 from sqlalchemy import Connection
-import sqlparse
 
 from .....exceptions import RecordSetEnd, ReturnsNoRecords, SqlQueryException
 from .querymanager import QueryManager
@@ -24,6 +23,10 @@ class PostgresManager(QueryManager):
         super().__init__(connection, target_query, parent)
 
         self.__current_statement = 0
+        # NOTE: sqlparse is imported here rather than at the top of the module so that
+        # it's only loaded once a query is actually run
+        import sqlparse  # pylint: disable=import-outside-toplevel
+
         self.__statements = sqlparse.split(target_query.text)
         self.__postgres_error = False
 
@@ -2,7 +2,6 @@ import sqlite3
 from typing import List, Tuple
 
 from sqlalchemy import Connection
-import sqlparse
 
 from .....exceptions import RecordSetEnd, ReturnsNoRecords, SqlQueryException
 from .querymanager import QueryManager
@@ -23,6 +22,10 @@ class SqliteManager(QueryManager):
         super().__init__(connection, target_query, parent)
 
         self.__current_statement = 0
+        # NOTE: sqlparse is imported here rather than at the top of the module so that
+        # it's only loaded once a query is actually run
+        import sqlparse  # pylint: disable=import-outside-toplevel
+
         self.__statements = sqlparse.split(target_query.text)
         self.__sqlite_error = False
 
@@ -372,6 +372,14 @@ class SaBackend(SqlBackend):
     def set_alias(self: "SqlBackend", alias_name: str) -> None:
         self.__alias = alias_name
 
+    def wait_for_inspection(self: "SaBackend", timeout: float | None = None) -> bool:
+        # inspection is trivially complete if it was never started
+        if self.__inspector is None:
+            return True
+
+        self.__inspector.join(timeout)
+        return not self.__inspector.is_alive()
+
     def _show_dialect_warnings(self: "SaBackend", connection_url: URL) -> None:
         warnings.simplefilter("always")
 
@@ -490,7 +498,7 @@ class SaBackend(SqlBackend):
                 and dialect_string in dialect_connection_prompt_models
             ):
                 dialect_prompt_model: ConnectionPromptModel = (
-                    dialect_connection_prompt_models[dialect_string]
+                    dialect_connection_prompt_models[dialect_string]()
                 )
 
                 # prompt the user with the prompt model and construct a url from it
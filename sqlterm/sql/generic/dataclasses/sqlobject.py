@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Set
+import functools
+from typing import List, Set
 
 from ..enums import SqlObjectType
 
@@ -21,6 +22,15 @@ class SqlObject:
 
         return flattened_children
 
+    @functools.cached_property
+    def sorted_children(self: "SqlObject") -> List["SqlObject"]:
+        # NOTE: the children of an object don't change once its structure has been
+        # inspected so they only ever need to be sorted once
+        return sorted(
+            self.children,
+            key=lambda sql_object: (sql_object.type, sql_object.name.lower()),
+        )
+
     def __hash__(self: "SqlObject") -> int:
         return hash(
             f"{self.name}{self.type}{sum(hash(child) for child in self.children)}{self.is_alias}"
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Set
+import functools
+from typing import List, Set
 
 from ..enums import SqlDialect
 from .sqlobject import SqlObject
@@ -12,6 +13,15 @@ class SqlStructure:
     keywords: Set[SqlObject]
     builtin_types: Set[SqlObject]
 
+    @functools.cached_property
+    def browsable_objects(self: "SqlStructure") -> List[SqlObject]:
+        # NOTE: a structure doesn't change once it has been inspected so its top-level
+        # objects only ever need to be filtered and sorted once
+        return sorted(
+            (sql_object for sql_object in self.objects if not sql_object.builtin),
+            key=lambda sql_object: sql_object.name,
+        )
+
     def flatten(self: "SqlStructure") -> Set[SqlObject]:
         flattened_children: Set[SqlObject] = set()
 
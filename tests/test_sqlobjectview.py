@@ -0,0 +1,44 @@
+import unittest
+
+from prompt_toolkit.layout.containers import HSplit
+
+from sqlterm.prompt.backends.prompt_toolkit.controls.sqlobjectview import (
+    SqlObjectView,
+)
+from sqlterm.sql.generic.dataclasses import SqlObject
+from sqlterm.sql.generic.enums import SqlObjectType
+
+
+class TestSqlObjectViewHierarchy(unittest.TestCase):
+    def test_child_of_first_top_level_object_includes_ancestor(
+        self: "TestSqlObjectViewHierarchy",
+    ) -> None:
+        table: SqlObject = SqlObject("table", SqlObjectType.TABLE, set())
+        schema: SqlObject = SqlObject("schema", SqlObjectType.SCHEMA, {table})
+        first_database: SqlObject = SqlObject("first", SqlObjectType.DATABASE, {schema})
+        second_database: SqlObject = SqlObject("second", SqlObjectType.DATABASE, set())
+
+        objects_hsplit: HSplit = HSplit(
+            [SqlObjectView(first_database), SqlObjectView(second_database)]
+        )
+        for child in objects_hsplit.children:
+            child.parent = objects_hsplit
+
+        # expand the first top-level object and its schema so the table is visible
+        objects_hsplit.children[0].expand_if_collapsed()
+        objects_hsplit.children[1].expand_if_collapsed()
+        table_view: SqlObjectView = objects_hsplit.children[2]
+
+        self.assertEqual(table_view.sql_object, table)
+        self.assertEqual(table_view.get_hierarchy(), [first_database, schema, table])
+
+    def test_top_level_object_is_its_own_hierarchy(
+        self: "TestSqlObjectViewHierarchy",
+    ) -> None:
+        database: SqlObject = SqlObject("database", SqlObjectType.DATABASE, set())
+
+        self.assertEqual(SqlObjectView(database).get_hierarchy(), [database])
+
+
+if __name__ == "__main__":
+    unittest.main()